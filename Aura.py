@@ -3,12 +3,16 @@ import json
 import threading
 import math
 from SQLiteDB import SQLiteDB
-import sys
+from MatchState import MatchState
+from Profiler import Profiler
+from TickStore import TickStore
+from Scheduler import KickoffScheduler
 import time
 import logging
 from concurrent.futures import ThreadPoolExecutor
 from functools import lru_cache
 import signal
+import argparse
 import config
 
 # Configure logging
@@ -21,25 +25,59 @@ SITEURL = config.API_BASE_URL
 MAX_WORKERS = config.MAX_WORKERS  # Limit concurrent threads
 REFRESH_INTERVAL = config.REFRESH_INTERVAL  # Seconds between game updates
 API_TIMEOUT = config.API_TIMEOUT  # API request timeout
+PREMATCH_STATUSES = ["Pre-match bets", "Pre-game betting"]
+# Arm monitoring this many seconds before kickoff, never earlier than GetGame accepts
+KICKOFF_LEAD = min(config.KICKOFF_LEAD_SECONDS, config.MAX_START_TIME_MINUTES * 60)
+
+
+def load_feeds(feeds):
+    """Fill in feed defaults from the single-feed game data settings"""
+    defaults = {
+        'sports': config.SPORTS_ID,
+        'country': config.COUNTRY_ID,
+        'partner': config.PARTNER_ID,
+        'page_size': config.GAMES_COUNT,
+        'max_pages': 10,
+        'interval': config.MAIN_LOOP_INTERVAL
+    }
+    loaded = []
+    for position, feed in enumerate(feeds):
+        feed = {**defaults, **feed}
+        feed.setdefault('name', f"feed{position}")
+        loaded.append(feed)
+    return loaded
+
+
+FEEDS = load_feeds(getattr(config, 'FEEDS', None) or [{'name': 'default'}])
+FEEDS_BY_NAME = {feed['name']: feed for feed in FEEDS}
+unpaged_feeds = set()  # Names of feeds found to ignore the page offset, fetched one page per round
 
 # Global variables
-CheckedMatches = set()  # Use set for faster lookups
+match_state = MatchState(ttl=config.MATCH_STATE_TTL,
+                         finished_ttl=config.MATCH_STATE_FINISHED_TTL,
+                         max_size=config.MATCH_STATE_MAX_SIZE)  # Bounded per-match state
 active_threads = {}  # Track active threads
 shutdown_event = threading.Event()
 db_instance = None
+tick_store = None  # Created in StartProject when TICK_STORE_ENABLED
+profiler = Profiler(window=config.PROFILE_WINDOW)  # Enabled with --profile
 
-# Session for connection pooling
+# Session for connection pooling, shared by all feeds and match timers
 session = requests.Session()
 session.timeout = API_TIMEOUT
+session.mount("https://", requests.adapters.HTTPAdapter(pool_maxsize=MAX_WORKERS))
+session.mount("http://", requests.adapters.HTTPAdapter(pool_maxsize=MAX_WORKERS))
+discovery_executor = ThreadPoolExecutor(max_workers=len(FEEDS), thread_name_prefix="discovery")
 
 
 def signal_handler(signum, frame):
-    """Handle shutdown gracefully"""
+    """Handle shutdown gracefully; buffers are flushed by the __main__ cleanup, not here,
+    since the interrupted code may hold the tick store or database locks"""
+    if shutdown_event.is_set():
+        return
     logger.info("Shutting down gracefully...")
     shutdown_event.set()
-    if db_instance:
-        db_instance.close()
-    sys.exit(0)
+    raise KeyboardInterrupt
 
 signal.signal(signal.SIGINT, signal_handler)
 signal.signal(signal.SIGTERM, signal_handler)
@@ -58,7 +96,7 @@ def should_process_league(league):
 
 def should_monitor_game(status, time_all):
     """Check if game should be monitored based on status and start time"""
-    if status in ["Pre-match bets", "Pre-game betting"]:
+    if status in PREMATCH_STATUSES:
         # If game hasn't started and starts in more than configured minutes, skip it
         max_seconds = config.MAX_START_TIME_MINUTES * 60
         if time_all > max_seconds:
@@ -66,16 +104,62 @@ def should_monitor_game(status, time_all):
     return True
 
 
-def make_api_request(url, max_retries=None):
+def count_odd_locks(game_info):
+    """Count blocked odds across all event groups of a game"""
+    odd_lock_count = 0
+    if 'GE' in game_info:
+        for lock_ge in game_info['GE']:
+            if 'E' in lock_ge:
+                for lock_gf in lock_ge['E']:
+                    for lock_gg in lock_gf:
+                        if lock_gg.get('B', False):
+                            odd_lock_count += 1
+    return odd_lock_count
+
+
+def start_monitoring(match_id, feed_name=None, delay=None):
+    """Start the polling timer for a match; the feed name travels with the polling chain"""
+    if delay is None:
+        delay = REFRESH_INTERVAL
+    if shutdown_event.is_set():
+        return None
+
+    timer = threading.Timer(delay, GetGame, args=(match_id, feed_name))
+    timer.name = str(match_id)
+    timer.daemon = True
+    active_threads[match_id] = timer
+    timer.start()
+    return timer
+
+
+def arm_match(match_id, feed_name):
+    """Kickoff scheduler callback: start polling a pre-match game"""
+    if match_id in active_threads:
+        return
+    logger.info(f"⏰ Arming match {match_id}, kickoff in about {KICKOFF_LEAD} seconds")
+    start_monitoring(match_id, feed_name, delay=0)
+
+
+def is_pinned(match_id):
+    """Check whether a match still has a polling chain or a kickoff index entry"""
+    return match_id in active_threads or match_id in kickoff_scheduler
+
+
+kickoff_scheduler = KickoffScheduler(arm_match, lead=KICKOFF_LEAD)
+
+
+def make_api_request(url, max_retries=None, stage="api"):
     """Make API request with retry logic and better error handling"""
     if max_retries is None:
         max_retries = config.MAX_RETRIES
 
     for attempt in range(max_retries):
         try:
-            response = session.get(url, timeout=API_TIMEOUT)
-            response.raise_for_status()
-            return response.json()
+            with profiler.stage(f"{stage}.fetch"):
+                response = session.get(url, timeout=API_TIMEOUT)
+                response.raise_for_status()
+            with profiler.stage(f"{stage}.decode"):
+                return response.json()
         except requests.exceptions.Timeout:
             logger.warning(f"API request timeout (attempt {attempt + 1})")
         except requests.exceptions.RequestException as e:
@@ -90,42 +174,131 @@ def make_api_request(url, max_retries=None):
     return None
 
 
-def GetGamesList():
-    """Optimized games list fetching"""
-    api_url = f"{SITEURL}/service-api/LiveFeed/Get1x2_VZip?sports={config.SPORTS_ID}&count={config.GAMES_COUNT}&lng=en&gr=666&mode=4&country={config.COUNTRY_ID}&partner={config.PARTNER_ID}&getEmpty=true&virtualSports=true&noFilterBlockEvent=true"
+def games_list_url(feed, skip=0):
+    """Build the games list URL for one page of a feed"""
+    url = f"{SITEURL}/service-api/LiveFeed/Get1x2_VZip?sports={feed['sports']}&count={feed['page_size']}&lng=en&gr=666&mode=4&country={feed['country']}&partner={feed['partner']}&getEmpty=true&virtualSports=true&noFilterBlockEvent=true"
+    if skip:
+        url += f"&skip={skip}"
+    return url
+
+
+def game_url(match_id, feed):
+    """Build the game details URL for a match of a feed"""
+    return f"{SITEURL}/service-api/LiveFeed/GetGameZip?id={match_id}&lng=en&cfview=0&isSubGames=true&GroupEvents=true&allEventsGroupSubGames=true&countevents=250&partner={feed['partner']}"
+
+
+def extract_game_info(game_info):
+    """Extract the fields GetGame uses from a game, filling in defaults
+
+    Returns (time_all, league, team1_name, team2_name, the_half, time_minute,
+    time_second, team1_score, team2_score, status).
+    """
+    time_all = game_info.get('SC', {}).get('TS', 0)
+    league = game_info.get('L', 'Unknown League')
+    team1_name = game_info.get('O1', 'Team 1')
+    team2_name = game_info.get('O2', 'Team 2')
+    the_half = game_info.get('SC', {}).get('CP', 0)
 
-    sport_data = make_api_request(api_url)
-    if not sport_data or 'Value' not in sport_data:
-        logger.error("Failed to fetch games list")
-        return []
+    # Calculate time
+    time_minute = math.floor(time_all / 60) if time_all else 0
+    time_second = time_all - (time_minute * 60) if time_all else 0
+    time_minute = f"{time_minute:02d}"
+    time_second = f"{time_second:02d}"
+
+    # Get scores with defaults
+    team1_score = game_info.get('SC', {}).get('FS', {}).get('S1', 0)
+    team2_score = game_info.get('SC', {}).get('FS', {}).get('S2', 0)
+
+    # Get status
+    status = game_info.get('SC', {}).get('I', "Game in Progress")
+
+    return (time_all, league, team1_name, team2_name, the_half, time_minute, time_second,
+            team1_score, team2_score, status)
+
+
+@profiler.timed("games_list.total")
+def GetGamesList(feed=None):
+    """Optimized games list fetching, one page at a time"""
+    if feed is None:
+        feed = FEEDS[0]
 
     return_data = []
-    for match in sport_data['Value']:
-        try:
-            match_id = match['I']
-            league = match['L']
-
-            # Get status with better error handling
-            status = 0
-            if 'SC' in match:
-                status = match['SC'].get('CPS', match['SC'].get('I', 0))
-
-            # Use cached league filtering
-            if should_process_league(league):
-                return_data.append({
-                    'MatchID': match_id,
-                    'League': league,
-                    'Status': status
-                })
-        except KeyError as e:
-            logger.warning(f"Incomplete match data: {e}")
-            continue
+    seen = set()
+    max_pages = 1 if feed['name'] in unpaged_feeds else feed['max_pages']
+    for page in range(max_pages):
+        sport_data = make_api_request(games_list_url(feed, page * feed['page_size']), stage="games_list")
+        if not sport_data or 'Value' not in sport_data:
+            if page == 0:
+                logger.error(f"Failed to fetch games list for feed {feed['name']}")
+            break
+
+        # An empty page is past the end of the list
+        if not sport_data['Value']:
+            break
+
+        new_matches = 0
+        with profiler.stage("games_list.parse"):
+            for match in sport_data['Value']:
+                try:
+                    match_id = match['I']
+                    league = match['L']
+
+                    # Pages may overlap, keep the first copy of each match
+                    if match_id in seen:
+                        continue
+                    seen.add(match_id)
+                    new_matches += 1
+
+                    # Get status with better error handling
+                    status = 0
+                    if 'SC' in match:
+                        status = match['SC'].get('CPS', match['SC'].get('I', 0))
+
+                    # Use cached league filtering
+                    if should_process_league(league):
+                        return_data.append({
+                            'MatchID': match_id,
+                            'League': league,
+                            'Status': status,
+                            'Feed': feed['name']
+                        })
+                except KeyError as e:
+                    logger.warning(f"Incomplete match data: {e}")
+                    continue
+
+        # A full page of matches already seen means the endpoint ignored the offset
+        if page and not new_matches and len(sport_data['Value']) >= feed['page_size']:
+            logger.warning(f"Feed {feed['name']} ignores the page offset, disabling paging")
+            unpaged_feeds.add(feed['name'])
+            break
 
-    logger.info(f"Found {len(return_data)} valid matches")
+        # A short page is the last page
+        if len(sport_data['Value']) < feed['page_size']:
+            break
+
+    logger.info(f"Found {len(return_data)} valid matches in feed {feed['name']}")
     return return_data
 
 
-def GetGame(match_id):
+def DiscoverGames(feeds):
+    """Fetch several feeds concurrently and merge their games by match ID"""
+    futures = {discovery_executor.submit(GetGamesList, feed): feed for feed in feeds}
+
+    games = {}
+    for future, feed in futures.items():
+        # One malformed feed must not stop the others from being merged
+        try:
+            feed_games = future.result()
+        except Exception as e:
+            logger.error(f"Error discovering feed {feed['name']}: {e}")
+            continue
+        for game in feed_games:
+            games.setdefault(game['MatchID'], game)
+    return list(games.values())
+
+
+@profiler.timed("game.total")
+def GetGame(match_id, feed_name=None):
     """Optimized game monitoring function"""
     global db_instance
 
@@ -144,12 +317,10 @@ def GetGame(match_id):
     if not db_instance:
         db_instance = SQLiteDB(DB_FILE)
 
-    CheckedMatches.add(match_id)
+    match_state.touch(match_id)
 
     # Fetch game data
-    api_url = f"{SITEURL}/service-api/LiveFeed/GetGameZip?id={match_id}&lng=en&cfview=0&isSubGames=true&GroupEvents=true&allEventsGroupSubGames=true&countevents=250&partner=36"
-
-    game_data = make_api_request(api_url)
+    game_data = make_api_request(game_url(match_id, FEEDS_BY_NAME.get(feed_name, FEEDS[0])), stage="game")
     if not game_data or 'Value' not in game_data:
         logger.error(f"Failed to fetch game data for match {match_id}")
         return
@@ -158,94 +329,96 @@ def GetGame(match_id):
 
     try:
         # Extract game information with better defaults
-        time_all = game_info.get('SC', {}).get('TS', 0)
-        league = game_info.get('L', 'Unknown League')
-        team1_name = game_info.get('O1', 'Team 1')
-        team2_name = game_info.get('O2', 'Team 2')
-        the_half = game_info.get('SC', {}).get('CP', 0)
-
-        # Calculate time
-        time_minute = math.floor(time_all / 60) if time_all else 0
-        time_second = time_all - (time_minute * 60) if time_all else 0
-        time_minute = f"{time_minute:02d}"
-        time_second = f"{time_second:02d}"
-
-        # Get scores with defaults
-        team1_score = game_info.get('SC', {}).get('FS', {}).get('S1', 0)
-        team2_score = game_info.get('SC', {}).get('FS', {}).get('S2', 0)
-
-        # Get status
-        status = game_info.get('SC', {}).get('I', "Game in Progress")
+        with profiler.stage("game.extract"):
+            (time_all, league, team1_name, team2_name, the_half, time_minute, time_second,
+             team1_score, team2_score, status) = extract_game_info(game_info)
 
         # Check if we should monitor this game based on status and start time
         if not should_monitor_game(status, time_all):
-            logger.info(f"Skipping match {match_id}: {team1_name} vs {team2_name} - starts in {math.floor(time_all/60)} minutes")
+            # Kickoff moved back, park the match in the kickoff index until it is due again
+            kickoff_scheduler.schedule(match_id, time_all, feed_name)
+            logger.info(f"Deferring match {match_id}: {team1_name} vs {team2_name} - starts in {math.floor(time_all/60)} minutes")
             if match_id in active_threads:
                 del active_threads[match_id]
             return
 
         # Check for odd locks (optimized)
-        odd_lock_count = 0
-        if 'GE' in game_info:
-            for lock_ge in game_info['GE']:
-                if 'E' in lock_ge:
-                    for lock_gf in lock_ge['E']:
-                        for lock_gg in lock_gf:
-                            if lock_gg.get('B', False):
-                                odd_lock_count += 1
+        with profiler.stage("game.odds_lock"):
+            odd_lock_count = count_odd_locks(game_info)
 
         if odd_lock_count >= 5:
             logger.warning(f"Odd lock detected for match {match_id}")
 
+        match_state.record_tick(match_id, the_half, odd_lock_count,
+                                next_due=time.monotonic() + REFRESH_INTERVAL)
+
+        # Record the tick for replay and analysis
+        if tick_store:
+            with profiler.stage("game.tick_store"):
+                tick_store.append(match_id, time_all, the_half, team1_score, team2_score, status, odd_lock_count)
+
         # Check for goals and update database
-        stored_match = db_instance.GetMatch(match_id)
-        if stored_match:
-            # Check for new goals
-            if stored_match['Team1Score'] != team1_score:
-                logger.info(f"🥅 GOAL! Team 1 scored in match {match_id}")
-                goal_details = {'H': the_half, 'M': int(time_minute), 'T': 1}
-                db_instance.AddToGoalData(match_id, goal_details)
-
-            if stored_match['Team2Score'] != team2_score:
-                logger.info(f"🥅 GOAL! Team 2 scored in match {match_id}")
-                goal_details = {'H': the_half, 'M': int(time_minute), 'T': 2}
-                db_instance.AddToGoalData(match_id, goal_details)
-        else:
-            # Create new match record
-            match_object = {
-                'id': match_id,
-                'Team1Name': team1_name,
-                'Team2Name': team2_name,
-                'Team1Score': team1_score,
-                'Team2Score': team2_score,
-                'League': league
-            }
-            db_instance.CreateMatch(match_object)
-            logger.info(f"Created new match record: {team1_name} vs {team2_name}")
+        with profiler.stage("game.db"):
+            record = match_state.touch(match_id)
+            if record.team1_score is None:
+                # Load the stored scores once, later ticks compare against the in-memory record
+                stored_match = db_instance.GetMatch(match_id)
+                if stored_match:
+                    record = match_state.update(match_id, stored_match['Team1Score'], stored_match['Team2Score'])
+                else:
+                    # Create new match record
+                    match_object = {
+                        'id': match_id,
+                        'Team1Name': team1_name,
+                        'Team2Name': team2_name,
+                        'Team1Score': team1_score,
+                        'Team2Score': team2_score,
+                        'League': league
+                    }
+                    if db_instance.CreateMatch(match_object):
+                        record = match_state.update(match_id, team1_score, team2_score)
+                        logger.info(f"Created new match record: {team1_name} vs {team2_name}")
+
+            if record.team1_score is not None:
+                stored_team1_score = record.team1_score
+                stored_team2_score = record.team2_score
+
+                # Check for new goals, the stored score moves by one goal per tick
+                if stored_team1_score != team1_score:
+                    logger.info(f"🥅 GOAL! Team 1 scored in match {match_id}")
+                    goal_details = {'H': the_half, 'M': int(time_minute), 'T': 1}
+                    if db_instance.AddToGoalData(match_id, goal_details):
+                        stored_team1_score += 1
+
+                if stored_team2_score != team2_score:
+                    logger.info(f"🥅 GOAL! Team 2 scored in match {match_id}")
+                    goal_details = {'H': the_half, 'M': int(time_minute), 'T': 2}
+                    if db_instance.AddToGoalData(match_id, goal_details):
+                        stored_team2_score += 1
+
+                match_state.update(match_id, stored_team1_score, stored_team2_score)
 
         # Handle match finish
         if status == "Match finished":
             db_instance.FinishMatch(match_id)
+            match_state.finish(match_id)
             logger.info(f"Match {match_id} finished: {team1_name} {team1_score}-{team2_score} {team2_name}")
             if match_id in active_threads:
                 del active_threads[match_id]
             return
 
         # Log match status
-        logger.info(f"Match {match_id}: {team1_name} vs {team2_name}")
-        if status in ["Pre-match bets", "Pre-game betting"]:
-            logger.info(f"  ⏱️ Starts in: {time_minute}:{time_second}")
-        else:
-            logger.info(f"  ⚽ {team1_score}:{team2_score} | {time_minute}:{time_second} | {status}")
-            logger.info(f"  🏆 League: {league}")
+        with profiler.stage("game.log"):
+            logger.info(f"Match {match_id}: {team1_name} vs {team2_name}")
+            if status in PREMATCH_STATUSES:
+                logger.info(f"  ⏱️ Starts in: {time_minute}:{time_second}")
+            else:
+                logger.info(f"  ⚽ {team1_score}:{team2_score} | {time_minute}:{time_second} | {status}")
+                logger.info(f"  🏆 League: {league}")
 
         # Schedule next update if not shutting down
         if not shutdown_event.is_set():
-            timer = threading.Timer(REFRESH_INTERVAL, GetGame, args=(match_id,))
-            timer.name = str(match_id)
-            timer.daemon = True
-            active_threads[match_id] = timer
-            timer.start()
+            start_monitoring(match_id, feed_name)
 
     except Exception as e:
         logger.error(f"Error processing match {match_id}: {e}")
@@ -258,73 +431,98 @@ def GetGame(match_id):
 
 def StartProject():
     """Optimized project startup with better resource management"""
-    global db_instance
+    global db_instance, tick_store
 
-    logger.info("🚀 Starting AURA Sports Monitor...")
+    logger.info(f"🚀 Starting AURA Sports Monitor with {len(FEEDS)} feed(s)...")
 
-    # Initialize database
+    # Initialize database and tick history
     db_instance = SQLiteDB(DB_FILE)
+    if config.TICK_STORE_ENABLED and tick_store is None:
+        tick_store = TickStore(config.TICK_STORE_DIR, buffer_size=config.TICK_STORE_BUFFER_SIZE,
+                               flush_interval=config.TICK_STORE_FLUSH_INTERVAL)
+    kickoff_scheduler.start()
+
+    # Each feed is rediscovered on its own cadence
+    feed_due = {feed['name']: 0.0 for feed in FEEDS}
 
     while not shutdown_event.is_set():
         try:
-            # Get active games
-            all_games = GetGamesList()
+            # Get active games from every feed that is due
+            now = time.monotonic()
+            due_feeds = [feed for feed in FEEDS if feed_due[feed['name']] <= now]
+            for feed in due_feeds:
+                feed_due[feed['name']] = now + feed['interval']
 
+            all_games = DiscoverGames(due_feeds)
+
+            # Sparse feeds often return nothing; still run the maintenance below
             if not all_games:
-                logger.warning(f"No games found, retrying in {config.MAIN_LOOP_INTERVAL} seconds...")
-                time.sleep(config.MAIN_LOOP_INTERVAL)
-                continue
+                logger.warning(f"No games found in {len(due_feeds)} due feed(s)")
 
             # Start monitoring new games
             new_matches = 0
             for game in all_games:
                 match_id = game['MatchID']
+                feed = FEEDS_BY_NAME[game['Feed']]
+                match_state.touch(match_id)
 
-                # Skip if already being monitored
-                if match_id in active_threads:
+                # Skip if already being monitored or waiting for kickoff
+                if match_id in active_threads or match_id in kickoff_scheduler:
                     continue
 
                 # Check if match is finished in database
-                stored_match = db_instance.GetMatch(match_id)
+                with profiler.stage("precheck.db"):
+                    stored_match = db_instance.GetMatch(match_id)
                 if stored_match and stored_match.get('status') == 1:
                     continue
 
-                # Quick pre-check: Don't even start monitoring games that start too far in future
-                # We need to fetch basic game info to check start time
-                api_url = f"{SITEURL}/service-api/LiveFeed/GetGameZip?id={match_id}&lng=en&cfview=0&isSubGames=true&GroupEvents=true&allEventsGroupSubGames=true&countevents=250&partner=36"
-                quick_check_data = make_api_request(api_url)
+                # Quick pre-check: games that start later go into the kickoff index and
+                # cost no further requests until they are armed at kickoff minus the lead
+                quick_check_data = make_api_request(game_url(match_id, feed), stage="precheck")
 
                 if quick_check_data and 'Value' in quick_check_data:
                     game_info = quick_check_data['Value']
                     time_all = game_info.get('SC', {}).get('TS', 0)
                     status = game_info.get('SC', {}).get('I', "Game in Progress")
 
-                    # Skip if game starts too far in the future
-                    if not should_monitor_game(status, time_all):
-                        logger.info(f"Skipping match {match_id} - starts in {math.floor(time_all/60) if time_all else 0} minutes")
+                    if status in PREMATCH_STATUSES and time_all and time_all > KICKOFF_LEAD:
+                        kickoff_scheduler.schedule(match_id, time_all, feed['name'])
+                        logger.info(f"Scheduled match {match_id} - starts in {math.floor(time_all/60)} minutes")
                         continue
 
                 # Start monitoring this match
-                timer = threading.Timer(REFRESH_INTERVAL, GetGame, args=(match_id,))
-                timer.name = str(match_id)
-                timer.daemon = True
-                active_threads[match_id] = timer
-                timer.start()
+                start_monitoring(match_id, feed['name'])
                 new_matches += 1
 
-            logger.info(f"Monitoring {len(active_threads)} matches ({new_matches} new)")
+            logger.info(f"Monitoring {len(active_threads)} matches ({new_matches} new, {len(kickoff_scheduler)} awaiting kickoff)")
 
             # Clean up finished threads
             finished_threads = []
-            for match_id, thread in active_threads.items():
+            # Timer and scheduler threads change active_threads concurrently, iterate over a snapshot
+            for match_id, thread in list(active_threads.items()):
                 if not thread.is_alive():
                     finished_threads.append(match_id)
 
             for match_id in finished_threads:
                 del active_threads[match_id]
 
-            # Wait before next iteration
-            time.sleep(config.MAIN_LOOP_INTERVAL)
+            # Evict finished or vanished matches and cancel any stale timers; size pressure
+            # alone never evicts a match that is still polled or awaiting kickoff
+            for match_id in match_state.evict(pinned=is_pinned):
+                kickoff_scheduler.cancel(match_id)
+                timer = active_threads.pop(match_id, None)
+                if timer:
+                    timer.cancel()
+
+            # Persist buffered ticks even when few matches are live
+            if tick_store:
+                tick_store.flush()
+
+            usage = match_state.memory_usage()
+            logger.info(f"Match state: {usage['count']} matches (~{usage['bytes'] / 1024:.1f} KiB)")
+
+            # Wait until the next feed is due
+            time.sleep(max(0, min(feed_due.values()) - time.monotonic()))
 
         except Exception as e:
             logger.error(f"Error in main loop: {e}")
@@ -332,12 +530,28 @@ def StartProject():
 
 
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="AURA Sports Monitor")
+    parser.add_argument("--profile", action="store_true",
+                        help="time each stage of the polling hot path and log p50/p95/p99 tables")
+    args = parser.parse_args()
+
+    if args.profile:
+        profiler.enabled = True
+        profiler.start_reporter(config.PROFILE_REPORT_INTERVAL, shutdown_event)
+        if profiler.install_signal_handler(config.PROFILE_SAMPLE_SECONDS, config.PROFILE_SAMPLE_INTERVAL,
+                                           config.PROFILE_OUTPUT_DIR):
+            logger.info("Profiling enabled, send SIGUSR1 for a stack sampling snapshot")
+
     try:
         StartProject()
     except KeyboardInterrupt:
         logger.info("Received interrupt signal")
     finally:
         shutdown_event.set()
+        kickoff_scheduler.stop()
+        discovery_executor.shutdown(wait=False)
+        if tick_store:
+            tick_store.close()
         if db_instance:
             db_instance.close()
         logger.info("Application shutdown complete")
@@ -0,0 +1,140 @@
+import sys
+import threading
+import time
+import logging
+from collections import OrderedDict
+
+logger = logging.getLogger(__name__)
+
+
+class MatchRecord:
+    """Compact per-match state kept between ticks"""
+    __slots__ = ('match_id', 'team1_score', 'team2_score', 'phase',
+                 'last_tick', 'next_due', 'lock_count', 'finished')
+
+    def __init__(self, match_id):
+        self.match_id = match_id
+        self.team1_score = None  # Stored scores, None until loaded from the database
+        self.team2_score = None
+        self.phase = 0
+        self.last_tick = 0.0
+        self.next_due = 0.0
+        self.lock_count = 0
+        self.finished = False
+
+    def __repr__(self):
+        return (f"MatchRecord(id={self.match_id}, score={self.team1_score}:{self.team2_score}, "
+                f"phase={self.phase}, locks={self.lock_count}, finished={self.finished})")
+
+
+class MatchState:
+    """Bounded registry of in-process match state with TTL eviction"""
+
+    def __init__(self, ttl=1800, finished_ttl=300, max_size=2000):
+        self.ttl = ttl
+        self.finished_ttl = finished_ttl
+        self.max_size = max_size
+        self._records = OrderedDict()  # Ordered by last tick, oldest first
+        self._lock = threading.Lock()
+
+    def __contains__(self, match_id):
+        return match_id in self._records
+
+    def __len__(self):
+        return len(self._records)
+
+    def get(self, match_id):
+        """Get the record for a match, or None if it is not tracked"""
+        return self._records.get(match_id)
+
+    def _touch(self, match_id, now):
+        """Get or create a record and move it to the fresh end; caller holds the lock"""
+        record = self._records.get(match_id)
+        if record is None:
+            record = MatchRecord(match_id)
+            self._records[match_id] = record
+        else:
+            self._records.move_to_end(match_id)
+        record.last_tick = time.monotonic() if now is None else now
+        return record
+
+    def touch(self, match_id, now=None):
+        """Get or create the record for a match and mark it as seen"""
+        with self._lock:
+            return self._touch(match_id, now)
+
+    def update(self, match_id, team1_score, team2_score):
+        """Record the stored scores of a match"""
+        with self._lock:
+            record = self._touch(match_id, None)
+            record.team1_score = team1_score
+            record.team2_score = team2_score
+            return record
+
+    def record_tick(self, match_id, phase, lock_count, next_due=0.0):
+        """Record the period, odd lock count and next poll time seen on a tick"""
+        with self._lock:
+            record = self._touch(match_id, None)
+            record.phase = phase
+            record.lock_count = lock_count
+            record.next_due = next_due
+            return record
+
+    def finish(self, match_id):
+        """Mark a match as finished so it is evicted after the finished TTL"""
+        with self._lock:
+            record = self._touch(match_id, None)
+            record.finished = True
+            record.next_due = 0.0
+            return record
+
+    def evict(self, now=None, pinned=None):
+        """Evict finished and vanished matches, then trim to max_size; returns the evicted IDs
+
+        pinned(match_id) marks matches that are still being polled or awaiting kickoff.
+        They are never evicted just to stay under max_size, so the registry may stay
+        over the limit while every record is pinned.
+        """
+        if now is None:
+            now = time.monotonic()
+
+        evicted = []
+        with self._lock:
+            # Records are ordered by last tick, so stop at the first fresh one
+            for match_id, record in list(self._records.items()):
+                age = now - record.last_tick
+                if age < self.finished_ttl and age < self.ttl:
+                    break
+                if age >= self.ttl or (record.finished and age >= self.finished_ttl):
+                    del self._records[match_id]
+                    evicted.append(match_id)
+
+            # Under size pressure drop the oldest records without a polling chain
+            excess = len(self._records) - self.max_size
+            if excess > 0:
+                for match_id in list(self._records):
+                    if not excess:
+                        break
+                    if pinned and pinned(match_id):
+                        continue
+                    del self._records[match_id]
+                    evicted.append(match_id)
+                    excess -= 1
+                if excess:
+                    logger.warning(f"Match state over its {self.max_size} record limit, "
+                                   f"{excess} extra matches are still being polled")
+
+        if evicted:
+            logger.debug(f"Evicted {len(evicted)} matches from match state")
+        return evicted
+
+    def memory_usage(self):
+        """Report the number of tracked matches and their approximate size in bytes"""
+        with self._lock:
+            records = list(self._records.values())
+            size = sys.getsizeof(self._records)
+
+        for record in records:
+            size += sys.getsizeof(record) + sys.getsizeof(record.match_id)
+
+        return {'count': len(records), 'bytes': size}
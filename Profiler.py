@@ -0,0 +1,176 @@
+import os
+import sys
+import signal
+import threading
+import time
+import logging
+import traceback
+import functools
+from collections import deque, Counter
+
+logger = logging.getLogger(__name__)
+
+
+class _Stage:
+    """Timer for a single stage, recorded on exit"""
+    __slots__ = ('profiler', 'name', 'start')
+
+    def __init__(self, profiler, name):
+        self.profiler = profiler
+        self.name = name
+        self.start = 0.0
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.profiler.record(self.name, time.perf_counter() - self.start)
+        return False
+
+
+class _NullStage:
+    """No-op timer used when profiling is disabled"""
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+
+_NULL_STAGE = _NullStage()
+
+
+class Profiler:
+    """Low-overhead per-stage timers with percentile reports and stack sampling"""
+
+    def __init__(self, enabled=False, window=2000):
+        self.enabled = enabled
+        self.window = window
+        self._samples = {}  # Stage name -> recent durations in seconds
+        self._lock = threading.Lock()
+        self._sampling = threading.Event()
+
+    def stage(self, name):
+        """Context manager timing one stage; free when profiling is disabled"""
+        if not self.enabled:
+            return _NULL_STAGE
+        return _Stage(self, name)
+
+    def timed(self, name):
+        """Decorator timing every call of a function as one stage"""
+        def decorator(func):
+            @functools.wraps(func)
+            def wrapper(*args, **kwargs):
+                with self.stage(name):
+                    return func(*args, **kwargs)
+            return wrapper
+        return decorator
+
+    def record(self, name, elapsed):
+        """Record a stage duration in seconds"""
+        samples = self._samples.get(name)
+        if samples is None:
+            with self._lock:
+                samples = self._samples.setdefault(name, deque(maxlen=self.window))
+        samples.append(elapsed)
+
+    def percentiles(self):
+        """Get count, p50, p95, p99 and max (in ms) for every stage"""
+        with self._lock:
+            snapshot = {name: list(samples) for name, samples in self._samples.items()}
+
+        stats = {}
+        for name, samples in snapshot.items():
+            if not samples:
+                continue
+            samples.sort()
+            count = len(samples)
+            stats[name] = {
+                'count': count,
+                'p50': samples[min(count - 1, int(count * 0.50))] * 1000,
+                'p95': samples[min(count - 1, int(count * 0.95))] * 1000,
+                'p99': samples[min(count - 1, int(count * 0.99))] * 1000,
+                'max': samples[-1] * 1000
+            }
+        return stats
+
+    def format_table(self):
+        """Format stage percentiles as a fixed-width table"""
+        stats = self.percentiles()
+        if not stats:
+            return "No profiling samples recorded"
+
+        width = max(len(name) for name in stats)
+        lines = [f"{'stage':<{width}} {'count':>7} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'max ms':>9}"]
+        for name in sorted(stats):
+            s = stats[name]
+            lines.append(f"{name:<{width}} {s['count']:>7} {s['p50']:>9.2f} {s['p95']:>9.2f} "
+                         f"{s['p99']:>9.2f} {s['max']:>9.2f}")
+        return "\n".join(lines)
+
+    def start_reporter(self, interval, stop_event):
+        """Log the percentile table every interval seconds until stop_event is set"""
+        def report_loop():
+            while not stop_event.wait(interval):
+                logger.info(f"Profile (last {self.window} samples per stage):\n{self.format_table()}")
+
+        thread = threading.Thread(target=report_loop, name="profile-reporter", daemon=True)
+        thread.start()
+        return thread
+
+    def sample_stacks(self, duration, interval, output_dir="."):
+        """Sample all thread stacks for duration seconds and write the hottest stacks to a file"""
+        if self._sampling.is_set():
+            logger.warning("Stack sampling already in progress")
+            return None
+        self._sampling.set()
+
+        try:
+            own_id = threading.get_ident()
+            stacks = Counter()
+            samples = 0
+            deadline = time.monotonic() + duration
+
+            while time.monotonic() < deadline:
+                for thread_id, frame in sys._current_frames().items():
+                    if thread_id == own_id:
+                        continue
+                    stack = traceback.extract_stack(frame)
+                    stacks[";".join(f"{os.path.basename(f.filename)}:{f.name}:{f.lineno}" for f in stack)] += 1
+                samples += 1
+                time.sleep(interval)
+
+            path = os.path.join(output_dir, f"aura-profile-{time.strftime('%Y%m%d-%H%M%S')}.txt")
+            with open(path, 'w') as f:
+                f.write(f"# {samples} samples over {duration}s\n\n")
+                f.write(self.format_table() + "\n\n")
+                for stack, count in stacks.most_common(50):
+                    f.write(f"{count} {stack}\n")
+
+            logger.info(f"Profile snapshot written to {path}")
+            return path
+
+        except Exception as e:
+            logger.error(f"Error sampling stacks: {e}")
+            return None
+
+        finally:
+            self._sampling.clear()
+
+    def install_signal_handler(self, duration, interval, output_dir=".", signum=None):
+        """Take a stack sampling snapshot whenever the process receives signum (SIGUSR1 by default)"""
+        if signum is None:
+            signum = getattr(signal, 'SIGUSR1', None)
+        if signum is None:
+            logger.warning("Signal-triggered profiling is not supported on this platform")
+            return False
+
+        def handler(signum, frame):
+            threading.Thread(target=self.sample_stacks, args=(duration, interval, output_dir),
+                             name="profile-sampler", daemon=True).start()
+
+        signal.signal(signum, handler)
+        return True
@@ -0,0 +1,104 @@
+import heapq
+import threading
+import time
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class KickoffScheduler:
+    """Kickoff-time index that arms monitoring of pre-match games at kickoff minus a lead"""
+
+    def __init__(self, callback, lead=60):
+        self.callback = callback
+        self.lead = lead
+        self._heap = []  # (arm_at, match_id), stale entries are skipped on pop
+        self._arm_at = {}  # Match ID -> current arm time
+        self._contexts = {}  # Match ID -> value passed to the callback, e.g. its feed
+        self._condition = threading.Condition()
+        self._stopped = False
+        self._thread = None
+
+    def __contains__(self, match_id):
+        return match_id in self._arm_at
+
+    def __len__(self):
+        return len(self._arm_at)
+
+    def start(self):
+        """Start the scheduler thread"""
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="kickoff-scheduler", daemon=True)
+            self._thread.start()
+        return self._thread
+
+    def stop(self):
+        """Stop the scheduler thread without arming pending matches"""
+        with self._condition:
+            self._stopped = True
+            self._condition.notify()
+
+    def schedule(self, match_id, seconds_to_start, context=None, now=None):
+        """Index a match by kickoff and arm it lead seconds before; returns the arm time
+
+        context is handed back to the callback as callback(match_id, context).
+        """
+        if now is None:
+            now = time.monotonic()
+        arm_at = now + max(0, seconds_to_start - self.lead)
+
+        with self._condition:
+            self._arm_at[match_id] = arm_at
+            self._contexts[match_id] = context
+            heapq.heappush(self._heap, (arm_at, match_id))
+            self._condition.notify()
+        return arm_at
+
+    def cancel(self, match_id):
+        """Remove a match from the index"""
+        with self._condition:
+            self._contexts.pop(match_id, None)
+            return self._arm_at.pop(match_id, None) is not None
+
+    def _pop_due(self):
+        """Wait for the next due match; it stays indexed until its callback has run"""
+        with self._condition:
+            while not self._stopped:
+                # Drop entries that were cancelled or rescheduled
+                while self._heap and self._arm_at.get(self._heap[0][1]) != self._heap[0][0]:
+                    heapq.heappop(self._heap)
+
+                if not self._heap:
+                    self._condition.wait()
+                    continue
+
+                arm_at, match_id = self._heap[0]
+                delay = arm_at - time.monotonic()
+                if delay > 0:
+                    self._condition.wait(delay)
+                    continue
+
+                heapq.heappop(self._heap)
+                return match_id, arm_at, self._contexts.get(match_id)
+            return None, None, None
+
+    def _done(self, match_id, arm_at):
+        """Drop an armed match from the index unless it was rescheduled meanwhile"""
+        with self._condition:
+            if self._arm_at.get(match_id) == arm_at:
+                del self._arm_at[match_id]
+                del self._contexts[match_id]
+
+    def _run(self):
+        while True:
+            match_id, arm_at, context = self._pop_due()
+            if match_id is None:
+                return
+            # Keep the match visible in the index until the callback has started monitoring it,
+            # so discovery always finds it in the index or in active_threads
+            try:
+                self.callback(match_id, context)
+            except Exception as e:
+                logger.error(f"Error arming match {match_id}: {e}")
+            finally:
+                self._done(match_id, arm_at)
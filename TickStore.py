@@ -0,0 +1,271 @@
+import os
+import json
+import mmap
+import struct
+import threading
+import time
+import logging
+
+try:
+    import numpy as np
+except ImportError:  # NumPy is optional, reads fall back to struct unpacking
+    np = None
+
+logger = logging.getLogger(__name__)
+
+# Fixed-width tick record: match id, wall time, clock (TS), period (CP),
+# team 1 score, team 2 score, status code, odd lock count, padding
+TICK_STRUCT = struct.Struct('<qdihhhhh2x')
+TICK_FIELDS = ('match_id', 'time', 'clock', 'phase', 'score1', 'score2', 'status', 'locks')
+TICK_SIZE = TICK_STRUCT.size
+
+# Fixed-width index record appended per flush: match id, first row, row count
+INDEX_STRUCT = struct.Struct('<qii')
+INDEX_SIZE = INDEX_STRUCT.size
+
+INT16_MIN, INT16_MAX = -2 ** 15, 2 ** 15 - 1
+INT32_MIN, INT32_MAX = -2 ** 31, 2 ** 31 - 1
+
+if np is not None:
+    TICK_DTYPE = np.dtype({
+        'names': list(TICK_FIELDS),
+        'formats': ['<i8', '<f8', '<i4', '<i2', '<i2', '<i2', '<i2', '<i2'],
+        'offsets': [0, 8, 16, 20, 22, 24, 26, 28],
+        'itemsize': TICK_SIZE
+    })
+    INDEX_DTYPE = np.dtype([('match_id', '<i8'), ('start', '<i4'), ('count', '<i4')])
+else:
+    TICK_DTYPE = None
+    INDEX_DTYPE = None
+
+
+def _clamp(value, low, high):
+    """Convert to int and clamp into a fixed-width field's range"""
+    return max(low, min(high, int(value or 0)))
+
+
+class TickStore:
+    """Append-only, day-partitioned binary store of per-tick match state"""
+
+    def __init__(self, base_dir="ticks", buffer_size=500, flush_interval=30.0):
+        self.base_dir = base_dir
+        self.buffer_size = buffer_size
+        self.flush_interval = flush_interval
+        self.max_buffered = buffer_size * 20  # Oldest ticks are dropped beyond this while writes fail
+        self._buffer = []
+        self._last_flush = time.monotonic()
+        self._lock = threading.Lock()  # Guards the buffer and status vocabulary
+        self._write_lock = threading.Lock()  # Serializes file writes, held outside _lock
+
+        os.makedirs(self.base_dir, exist_ok=True)
+        self._statuses_path = os.path.join(self.base_dir, "statuses.json")
+        self._statuses = self._load_statuses()
+        self._status_codes = {status: code for code, status in enumerate(self._statuses)}
+
+    def _load_statuses(self):
+        try:
+            with open(self._statuses_path) as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return []
+        except Exception as e:
+            logger.error(f"Error reading {self._statuses_path}: {e}")
+            return []
+
+    def _write_statuses(self):
+        """Write the status vocabulary atomically so readers never see a partial file"""
+        tmp_path = f"{self._statuses_path}.tmp"
+        with open(tmp_path, 'w') as f:
+            json.dump(self._statuses, f, separators=(',', ':'))
+        os.replace(tmp_path, self._statuses_path)
+
+    def _day_dir(self, day):
+        return os.path.join(self.base_dir, day)
+
+    def _status_code(self, status):
+        code = self._status_codes.get(status)
+        if code is None:
+            code = len(self._statuses)
+            self._statuses.append(status)
+            self._status_codes[status] = code
+            self._write_statuses()
+        return code
+
+    def append(self, match_id, clock, phase, score1, score2, status, locks, now=None):
+        """Buffer one tick, flushing when the buffer is full or stale"""
+        if now is None:
+            now = time.time()
+
+        try:
+            tick = [int(match_id), float(now), _clamp(clock, INT32_MIN, INT32_MAX),
+                    _clamp(phase, INT16_MIN, INT16_MAX), _clamp(score1, INT16_MIN, INT16_MAX),
+                    _clamp(score2, INT16_MIN, INT16_MAX), 0, _clamp(locks, INT16_MIN, INT16_MAX)]
+        except (TypeError, ValueError) as e:
+            logger.warning(f"Dropping invalid tick for match {match_id}: {e}")
+            return
+
+        with self._lock:
+            tick[6] = self._status_code(str(status))
+            self._buffer.append(tuple(tick))
+            due = (len(self._buffer) >= self.buffer_size or
+                   time.monotonic() - self._last_flush >= self.flush_interval)
+
+        if due:
+            self.flush()
+
+    def flush(self):
+        """Write buffered ticks to their day partitions, returning how many were written"""
+        with self._lock:
+            buffer, self._buffer = self._buffer, []
+            self._last_flush = time.monotonic()
+        if not buffer:
+            return 0
+
+        # Group by day; the write sorts each day by match so it gets one range per flush
+        days = {}
+        for tick in buffer:
+            day = time.strftime('%Y-%m-%d', time.gmtime(tick[1]))
+            days.setdefault(day, []).append(tick)
+
+        written = 0
+        failed = []
+        with self._write_lock:
+            for day, ticks in days.items():
+                try:
+                    self._write_day(day, ticks)
+                    written += len(ticks)
+                except Exception as e:
+                    logger.error(f"Error writing ticks for {day}, keeping them buffered: {e}")
+                    failed.extend(ticks)
+
+        if failed:
+            with self._lock:
+                self._buffer[:0] = failed
+                overflow = len(self._buffer) - self.max_buffered
+                if overflow > 0:
+                    del self._buffer[:overflow]
+                    logger.error(f"Tick buffer full, dropped {overflow} oldest ticks")
+
+        return written
+
+    @staticmethod
+    def _append_records(path, record_size, data):
+        """Append whole records to a file, returning the index of the first new record"""
+        with open(path, 'ab') as f:
+            size = f.tell()
+            if size % record_size:
+                # Drop a partial record left behind by an interrupted write
+                size -= size % record_size
+                f.truncate(size)
+            f.write(data)
+        return size // record_size
+
+    def _write_day(self, day, ticks):
+        ticks.sort(key=lambda tick: tick[0])
+        day_dir = self._day_dir(day)
+        os.makedirs(day_dir, exist_ok=True)
+
+        row = self._append_records(os.path.join(day_dir, "ticks.bin"), TICK_SIZE,
+                                   b''.join(TICK_STRUCT.pack(*tick) for tick in ticks))
+
+        # One (match, start, count) record per match in this flush
+        entries = []
+        for tick in ticks:
+            if entries and entries[-1][0] == tick[0]:
+                entries[-1][2] += 1
+            else:
+                entries.append([tick[0], row, 1])
+            row += 1
+
+        try:
+            self._append_records(os.path.join(day_dir, "index.bin"), INDEX_SIZE,
+                                 b''.join(INDEX_STRUCT.pack(*entry) for entry in entries))
+        except Exception as e:
+            # The rows are written, so do not buffer them again; timeline() falls back to a scan
+            logger.error(f"Error writing tick index for {day}: {e}")
+            self._mark_index_incomplete(day_dir)
+
+    @staticmethod
+    def _mark_index_incomplete(day_dir):
+        try:
+            open(os.path.join(day_dir, "index.incomplete"), 'w').close()
+        except OSError:
+            pass
+
+    def close(self):
+        """Flush any buffered ticks"""
+        self.flush()
+
+    def days(self):
+        """List the stored day partitions, oldest first"""
+        return sorted(name for name in os.listdir(self.base_dir)
+                      if os.path.isfile(os.path.join(self.base_dir, name, "ticks.bin")))
+
+    def status_name(self, code):
+        """Get the status string for a stored status code"""
+        return self._statuses[code] if 0 <= code < len(self._statuses) else None
+
+    def read_day(self, day):
+        """Map a day partition; a NumPy record array when available, else a read-only mmap"""
+        data_path = os.path.join(self._day_dir(day), "ticks.bin")
+        rows = os.path.getsize(data_path) // TICK_SIZE
+        if np is not None:
+            if not rows:
+                return np.empty(0, dtype=TICK_DTYPE)
+            return np.memmap(data_path, dtype=TICK_DTYPE, mode='r', shape=(rows,))
+
+        if not rows:
+            return b''
+        with open(data_path, 'rb') as f:
+            return mmap.mmap(f.fileno(), rows * TICK_SIZE, access=mmap.ACCESS_READ)
+
+    def match_ranges(self, day, match_id):
+        """Get the (start_row, end_row) ranges of a match in a day, or None if the index is unusable"""
+        day_dir = self._day_dir(day)
+        index_path = os.path.join(day_dir, "index.bin")
+        if os.path.exists(os.path.join(day_dir, "index.incomplete")) or not os.path.exists(index_path):
+            return None
+
+        with open(index_path, 'rb') as f:
+            raw = f.read()
+        raw = raw[:len(raw) - len(raw) % INDEX_SIZE]
+
+        if np is not None:
+            index = np.frombuffer(raw, dtype=INDEX_DTYPE)
+            index = index[index['match_id'] == match_id]
+            return [(int(start), int(start + count)) for start, count in zip(index['start'], index['count'])]
+
+        return [(start, start + count) for entry_id, start, count in INDEX_STRUCT.iter_unpack(raw)
+                if entry_id == match_id]
+
+    def _scan_ranges(self, data, match_id):
+        """Find a match's rows by scanning the match_id column"""
+        if np is not None:
+            return [(int(row), int(row) + 1) for row in np.flatnonzero(data['match_id'] == match_id)]
+        rows = len(data) // TICK_SIZE
+        return [(row, row + 1) for row in range(rows)
+                if struct.unpack_from('<q', data, row * TICK_SIZE)[0] == match_id]
+
+    def timeline(self, match_id):
+        """Reconstruct the stored ticks of a match as a list of dicts, in time order"""
+        match_id = int(match_id)
+
+        timeline = []
+        for day in self.days():
+            data = self.read_day(day)
+            ranges = self.match_ranges(day, match_id)
+            if ranges is None:
+                ranges = self._scan_ranges(data, match_id)
+
+            for start, end in ranges:
+                if np is not None:
+                    rows = (tuple(row) for row in data[start:end].tolist())
+                else:
+                    rows = TICK_STRUCT.iter_unpack(data[start * TICK_SIZE:end * TICK_SIZE])
+                for row in rows:
+                    tick = dict(zip(TICK_FIELDS, row))
+                    tick['status'] = self.status_name(tick['status'])
+                    timeline.append(tick)
+
+        timeline.sort(key=lambda tick: tick['time'])
+        return timeline
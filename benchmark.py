@@ -0,0 +1,328 @@
+"""Microbenchmarks for the parsing, filtering and storage hot paths.
+
+Usage:
+    python3 benchmark.py run --output baseline.json
+    python3 benchmark.py compare baseline.json
+    python3 benchmark.py compare baseline.json --current results.json --threshold 0.15
+"""
+import os
+import sys
+import json
+import time
+import random
+import logging
+import argparse
+import platform
+import tempfile
+import itertools
+import statistics
+from unittest import mock
+
+GAMES_LIST_SIZES = [40, 400, 4000]
+DB_SIZES = [1000, 100000]
+GAME_EVENTS = 250
+
+LEAGUES = [
+    "FIFA 23. Volta International",
+    "FIFA 23. Premier League",
+    "FIFA 23. Penalty Shootout",
+    "FIFA 23. 3x3 Cyber League",
+    "FIFA 23. Champions League",
+    "FIFA 23. 4x4 Masters",
+    "FIFA 23. Bundesliga",
+    "FIFA 23. 5x5 Cyber Cup",
+]
+
+
+def make_games_list_payload(count, seed=1):
+    """Build a Get1x2_VZip response body with count matches"""
+    rng = random.Random(seed)
+    matches = []
+    for i in range(count):
+        in_play = rng.random() < 0.6
+        matches.append({
+            'I': 400000000 + i,
+            'L': rng.choice(LEAGUES),
+            'LI': 2000000 + i % 40,
+            'O1': f"Team {2 * i}",
+            'O2': f"Team {2 * i + 1}",
+            'S': 1700000000 + i * 60,
+            'SC': {
+                'CP': 1 if in_play else 0,
+                'CPS': "1st half" if in_play else "Pre-match bets",
+                'FS': {'S1': rng.randint(0, 3), 'S2': rng.randint(0, 3)} if in_play else {},
+                'I': "Game in Progress" if in_play else "Pre-match bets",
+                'TS': rng.randint(0, 2700)
+            },
+            'E': [{'T': t, 'C': round(rng.uniform(1.1, 9.0), 2), 'G': 1} for t in (1, 2, 3)]
+        })
+    return json.dumps({'Success': True, 'Value': matches})
+
+
+def make_game_payload(match_id, events=GAME_EVENTS, seed=1):
+    """Build a GetGameZip response body with the given number of odds events"""
+    rng = random.Random(seed)
+    groups = []
+    remaining = events
+    group_id = 1
+    while remaining:
+        columns = []
+        for _ in range(2):
+            column = []
+            for _ in range(min(5, remaining)):
+                column.append({'T': rng.randint(1, 200), 'C': round(rng.uniform(1.1, 9.0), 2),
+                               'G': group_id, 'B': rng.random() < 0.05})
+                remaining -= 1
+            if column:
+                columns.append(column)
+        groups.append({'G': group_id, 'GS': group_id, 'E': columns})
+        group_id += 1
+
+    return json.dumps({'Success': True, 'Value': {
+        'I': match_id,
+        'L': LEAGUES[0],
+        'O1': "Team 1",
+        'O2': "Team 2",
+        'SC': {'CP': 1, 'FS': {'S1': 0, 'S2': 0}, 'I': "Game in Progress", 'TS': 1234},
+        'GE': groups
+    }})
+
+
+def autorange(func, min_time):
+    """Find a call count that takes at least min_time seconds, like timeit.Timer.autorange"""
+    for number in itertools.chain.from_iterable((n, 2 * n, 5 * n) for n in (10 ** k for k in itertools.count())):
+        start = time.perf_counter()
+        for _ in range(number):
+            func()
+        elapsed = time.perf_counter() - start
+        if elapsed >= min_time:
+            return number, elapsed / number
+
+
+def bench(name, func, repeat, min_time):
+    """Time func, returning per-call statistics in microseconds"""
+    number, first = autorange(func, min_time)
+    times = [first]
+    for _ in range(repeat - 1):
+        start = time.perf_counter()
+        for _ in range(number):
+            func()
+        times.append((time.perf_counter() - start) / number)
+
+    result = {
+        'per_op_us': statistics.median(times) * 1e6,
+        'min_us': min(times) * 1e6,
+        'number': number,
+        'repeat': repeat
+    }
+    print(f"{name:<40} {result['per_op_us']:>12.2f} us  (min {result['min_us']:.2f} us, {number} x {repeat})")
+    return result
+
+
+def fresh_db(SQLiteDB, path, rows):
+    """Create a new database with rows unfinished matches, replacing the singleton"""
+    if SQLiteDB._instance is not None:
+        SQLiteDB._instance.close()
+        SQLiteDB._instance = None
+    for suffix in ("", "-wal", "-shm"):
+        if os.path.exists(path + suffix):
+            os.remove(path + suffix)
+
+    db = SQLiteDB(path)
+    db.conn.execute("BEGIN")
+    db.conn.executemany(
+        "INSERT INTO matches (id, Team1Name, Team2Name, Team1Score, Team2Score, League, GoalData) "
+        "VALUES (?, ?, ?, 0, 0, ?, '[]')",
+        ((match_id, f"Team {2 * match_id}", f"Team {2 * match_id + 1}", LEAGUES[match_id % len(LEAGUES)])
+         for match_id in range(1, rows + 1))
+    )
+    db.conn.execute("COMMIT")
+    return db
+
+
+def run_benchmarks(name_filter=None, repeat=5, min_time=0.2):
+    """Run every benchmark whose name contains name_filter"""
+    import Aura
+    from SQLiteDB import SQLiteDB
+    from MatchState import MatchState
+
+    results = {}
+
+    def run(name, func):
+        if name_filter and name_filter not in name:
+            return
+        results[name] = bench(name, func, repeat, min_time)
+
+    # Games list decoding, parsing and league filtering
+    for size in GAMES_LIST_SIZES:
+        body = make_games_list_payload(size)
+        feed = dict(Aura.FEEDS[0], page_size=size, max_pages=1)
+        with mock.patch.object(Aura, 'make_api_request', side_effect=lambda *args, **kwargs: json.loads(body)):
+            run(f"GetGamesList[{size}]", lambda: Aura.GetGamesList(feed))
+
+    leagues = [match['L'] for match in json.loads(make_games_list_payload(400))['Value']]
+
+    def filter_cold():
+        Aura.should_process_league.cache_clear()
+        for league in leagues:
+            Aura.should_process_league(league)
+
+    def filter_warm():
+        for league in leagues:
+            Aura.should_process_league(league)
+
+    run("should_process_league[cold,400]", filter_cold)
+    run("should_process_league[warm,400]", filter_warm)
+
+    # GetGame extraction and odds-lock walk on a full-size game body
+    game_body = make_game_payload(1)
+    game_info = json.loads(game_body)['Value']
+    run(f"GetGameZip.decode[{GAME_EVENTS}]", lambda: json.loads(game_body))
+    run("extract_game_info", lambda: Aura.extract_game_info(game_info))
+    run(f"count_odd_locks[{GAME_EVENTS}]", lambda: Aura.count_odd_locks(game_info))
+
+    # SQLiteDB methods at each table size
+    for size in DB_SIZES:
+        prefix = f"SQLiteDB[{size}]"
+        if name_filter and not any(name_filter in f"{prefix}.{method}" for method in
+                                   ("GetMatch", "CreateMatch", "AddToGoalData", "FinishMatch",
+                                    "GetActiveMatches", "GetGame")):
+            continue
+
+        db = fresh_db(SQLiteDB, os.path.abspath(f"bench_{size}.db"), size)
+        rng = random.Random(size)
+        new_ids = itertools.count(size + 1)
+        goal_ids = itertools.cycle(range(1, size + 1, 7))
+        finish_ids = itertools.cycle(range(2, size + 1, 7))
+
+        run(f"{prefix}.GetMatch", lambda: db.GetMatch(rng.randint(1, size)))
+        run(f"{prefix}.CreateMatch", lambda: db.CreateMatch({
+            'id': next(new_ids), 'Team1Name': "Team 1", 'Team2Name': "Team 2",
+            'Team1Score': 0, 'Team2Score': 0, 'League': LEAGUES[0]
+        }))
+        run(f"{prefix}.AddToGoalData", lambda: db.AddToGoalData(next(goal_ids), {'H': 1, 'M': 12, 'T': 1}))
+        run(f"{prefix}.FinishMatch", lambda: db.FinishMatch(next(finish_ids)))
+        run(f"{prefix}.GetActiveMatches", db.GetActiveMatches)
+
+        # GetGame ticks against this table, without scheduling the next tick. The first
+        # tick of a match loads its scores from the database; later ticks use match state
+        Aura.db_instance = db
+        Aura.tick_store = None
+        match_id = size // 2
+        body = make_game_payload(match_id)
+
+        def first_tick():
+            Aura.match_state = MatchState()
+            Aura.GetGame(match_id)
+
+        with mock.patch.object(Aura, 'make_api_request', side_effect=lambda *args, **kwargs: json.loads(body)), \
+                mock.patch.object(Aura, 'start_monitoring'):
+            saved_state = Aura.match_state
+            try:
+                run(f"{prefix}.GetGame[first]", first_tick)
+                Aura.match_state = MatchState()
+                run(f"{prefix}.GetGame[cached]", lambda: Aura.GetGame(match_id))
+            finally:
+                Aura.match_state = saved_state
+
+        db.close()
+        SQLiteDB._instance = None
+
+    return results
+
+
+def save_results(results, path):
+    """Save results with enough metadata to judge whether two runs are comparable"""
+    data = {
+        'meta': {
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'created': time.strftime('%Y-%m-%dT%H:%M:%S')
+        },
+        'results': results
+    }
+    with open(path, 'w') as f:
+        json.dump(data, f, indent=2, sort_keys=True)
+    print(f"Saved {len(results)} results to {path}")
+
+
+def compare_results(baseline, current, threshold):
+    """Print per-benchmark changes; return the names that regressed beyond threshold"""
+    regressions = []
+    print(f"{'benchmark':<40} {'baseline us':>12} {'current us':>12} {'change':>8}")
+    for name in sorted(set(baseline) | set(current)):
+        if name not in baseline or name not in current:
+            print(f"{name:<40} {'only in ' + ('current' if name in current else 'baseline'):>34}")
+            continue
+
+        before = baseline[name]['per_op_us']
+        after = current[name]['per_op_us']
+        change = (after - before) / before if before else 0.0
+        flag = ""
+        if change > threshold:
+            flag = "  REGRESSION"
+            regressions.append(name)
+        elif change < -threshold:
+            flag = "  faster"
+        print(f"{name:<40} {before:>12.2f} {after:>12.2f} {change:>+7.1%}{flag}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="AURA hot path microbenchmarks")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    run_parser = subparsers.add_parser("run", help="run the benchmarks and save the results as JSON")
+    run_parser.add_argument("--output", default="benchmark_results.json", help="results file")
+
+    compare_parser = subparsers.add_parser("compare", help="compare against a saved baseline")
+    compare_parser.add_argument("baseline", help="baseline results file")
+    compare_parser.add_argument("--current", help="results file to compare; runs the benchmarks if omitted")
+    compare_parser.add_argument("--threshold", type=float, default=0.10,
+                                help="relative slowdown reported as a regression (default 0.10)")
+
+    for sub in (run_parser, compare_parser):
+        sub.add_argument("--filter", help="only run benchmarks whose name contains this text")
+        sub.add_argument("--repeat", type=int, default=5, help="timed repeats per benchmark")
+        sub.add_argument("--min-time", type=float, default=0.2, help="minimum seconds per repeat")
+
+    args = parser.parse_args()
+
+    # Resolve paths before moving to a scratch directory for databases and tick files
+    output = os.path.abspath(args.output) if args.command == "run" else None
+    baseline_path = os.path.abspath(args.baseline) if args.command == "compare" else None
+    current_path = os.path.abspath(args.current) if args.command == "compare" and args.current else None
+
+    baseline = None
+    if baseline_path:
+        with open(baseline_path) as f:
+            baseline = json.load(f)['results']
+
+    current = None
+    if current_path:
+        with open(current_path) as f:
+            current = json.load(f)['results']
+
+    if current is None:
+        sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+        logging.disable(logging.WARNING)
+        with tempfile.TemporaryDirectory() as scratch:
+            os.chdir(scratch)
+            current = run_benchmarks(args.filter, args.repeat, args.min_time)
+
+    if output:
+        save_results(current, output)
+        return 0
+
+    if args.filter:
+        baseline = {name: result for name, result in baseline.items() if args.filter in name}
+
+    regressions = compare_results(baseline, current, args.threshold)
+    if regressions:
+        print(f"{len(regressions)} benchmark(s) regressed by more than {args.threshold:.0%}")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
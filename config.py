@@ -16,6 +16,25 @@ MAIN_LOOP_INTERVAL = 30  # seconds between checking for new games
 # Filtering settings
 EXCLUDED_LEAGUE_TERMS = ["Penalty", "3x3", "4x4", "5x5"]
 MAX_START_TIME_MINUTES = 5  # Skip games that start more than this many minutes in the future
+KICKOFF_LEAD_SECONDS = 60  # Start polling pre-match games this many seconds before kickoff
+
+# Match state settings
+MATCH_STATE_TTL = 1800  # seconds without a tick before a match is evicted
+MATCH_STATE_FINISHED_TTL = 300  # seconds a finished match is kept before eviction
+MATCH_STATE_MAX_SIZE = 2000  # maximum number of matches kept in memory
+
+# Tick history settings
+TICK_STORE_ENABLED = True
+TICK_STORE_DIR = "ticks"  # one sub-directory per UTC day
+TICK_STORE_BUFFER_SIZE = 500  # ticks buffered before writing
+TICK_STORE_FLUSH_INTERVAL = 30.0  # maximum seconds a tick stays buffered; longer means fewer index records
+
+# Profiling settings (used with --profile)
+PROFILE_WINDOW = 2000  # recent samples kept per stage
+PROFILE_REPORT_INTERVAL = 60  # seconds between percentile tables
+PROFILE_SAMPLE_SECONDS = 10  # duration of a SIGUSR1 stack sampling snapshot
+PROFILE_SAMPLE_INTERVAL = 0.01  # seconds between stack samples
+PROFILE_OUTPUT_DIR = "."  # where snapshots are written
 
 # Logging settings
 LOG_LEVEL = "INFO"
@@ -26,3 +45,17 @@ GAMES_COUNT = 40  # number of games to fetch from API
 SPORTS_ID = 85
 COUNTRY_ID = 169
 PARTNER_ID = 36
+
+# Discovery feeds, polled concurrently and merged by match ID.
+# Missing keys fall back to the game data settings above.
+FEEDS = [
+    {
+        'name': 'default',
+        'sports': SPORTS_ID,
+        'country': COUNTRY_ID,
+        'partner': PARTNER_ID,
+        'page_size': GAMES_COUNT,  # games requested per page
+        'max_pages': 10,  # paging stops early on a short page or if the skip offset is ignored
+        'interval': MAIN_LOOP_INTERVAL,  # seconds between discoveries of this feed
+    },
+]